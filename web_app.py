@@ -3,93 +3,439 @@ CL-RAM Thesis Visualization - Web Interface
 Flask web application for generating and viewing visualizations
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, render_template, request, send_file, send_from_directory, stream_with_context
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+import argparse
+import hashlib
 import json
+import logging
+import mmap
+import multiprocessing
+import queue
+import re
 import threading
+import time
+from functools import lru_cache
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import sys
 import os
 from werkzeug.utils import secure_filename
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Render off-screen; must be selected before the engine imports pyplot
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+
+# zlib level for chart PNGs (the default, 6, dominates chart save time)
+PNG_COMPRESS_LEVEL = 1
+_figure_savefig = Figure.savefig
+
+def _savefig_fast_png(self, fname, *args, **kwargs):
+    """Figure.savefig (and so plt.savefig) with fast PNG compression unless the caller sets its own,
+    installed in visualization workers by _init_viz_worker"""
+    fmt = kwargs.get('format')
+    if fmt is None:
+        suffix = os.path.splitext(fname)[1][1:] if isinstance(fname, (str, os.PathLike)) else ''
+        fmt = suffix or matplotlib.rcParams['savefig.format']
+    if str(fmt).lower() == 'png':
+        kwargs['pil_kwargs'] = {'compress_level': PNG_COMPRESS_LEVEL, **(kwargs.get('pil_kwargs') or {})}
+    return _figure_savefig(self, fname, *args, **kwargs)
+
 sys.path.insert(0, os.path.dirname(__file__))
 import visualization_engine as viz
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max
 
-# Global state
-current_status = {
-    'running': False,
-    'progress': 0,
-    'message': 'Ready',
-    'output_dir': None,
-    'charts': [],
-    'tables': [],
-    'error': None
+# Column types for the thesis result schema (used when pyarrow is unavailable)
+CSV_DTYPES = {'temperature': 'float64', 'success': 'int8'}
+
+# Copy buffer for writing uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# JSON files larger than this are streamed record by record, with a C ijson
+# backend only (the pure-Python one is much slower than orjson.loads)
+JSON_STREAM_THRESHOLD = 20 * 1024 * 1024  # 20MB
+IJSON_FAST_BACKENDS = {'yajl2_c', 'yajl2_cffi'}
+
+# Request handler threads for the production (waitress) server
+SERVER_THREADS = 8
+
+# Browser cache lifetime (seconds) for job-versioned chart/download URLs
+ASSET_MAX_AGE = 3600
+
+# Seconds between keep-alive comments on idle progress streams
+SSE_KEEPALIVE = 15
+
+# Seconds a finished job stays available to /progress
+JOB_TTL = 600
+
+# Open /progress streams allowed at once: each holds a server thread for the
+# whole job, so half the threads stay free for uploads and /status
+MAX_PROGRESS_STREAMS = SERVER_THREADS // 2
+
+# Error log written when run as a script
+LOG_FILE = 'web_app.log'
+
+# Generated output: one directory per session, plus results memoized by upload hash
+OUTPUT_ROOT = Path("thesis_visualizations")
+RESULT_CACHE_DIR = OUTPUT_ROOT / "by_hash"
+RESULT_COMPLETE_MARKER = '.complete'
+
+def _new_status(job_id=None):
+    """Status fields of an idle (or just submitted) job"""
+    return {
+        'running': False,
+        'progress': 0,
+        'message': 'Ready',
+        'output_dir': None,
+        'charts': [],
+        'tables': [],
+        'error': None,
+        'errors': [],
+        'job_id': job_id
+    }
+
+# Global state: status of the latest job, served by /status
+current_status = _new_status()
+
+# Submitted jobs by job id: {'status': the job's own status, 'subscribers': progress
+# queues of open /progress streams, 'finished': time.monotonic() when it stopped running}
+JOBS = {}
+state_lock = threading.Lock()
+
+# Visualization stages: (label, visualization_engine functions run in order,
+# labels of stages whose output it reads). A stage waits for its dependencies
+# and is skipped if one failed; every current function only reads df.
+VIZ_STAGES = [
+    ('linear progression', ['create_linear_progression_charts'], []),
+    ('temperature analysis', ['create_enhanced_temperature_analysis',
+                              'create_temperature_heatmaps',
+                              'create_2d_temperature_language_comparison'], []),
+    ('bar charts', ['create_enhanced_bar_charts'], []),
+    ('pie charts', ['create_pie_charts'], []),
+    ('heatmaps', ['create_model_language_heatmap',
+                  'create_category_language_heatmap'], []),
+    ('dashboard', ['create_analysis_summary_dashboard'], []),
+    ('tables', ['create_comparison_tables',
+                'create_temperature_comparison_table',
+                'create_model_specific_category_tables'], []),
+    ('model analysis', ['create_model_specific_temperature_language_analysis',
+                        'create_models_temperature_language_summary',
+                        'create_detailed_model_language_comparison'], []),
+]
+
+# DataFrame used by visualization worker processes
+_worker_df = None
+DF_CACHE_NAME = '_cache.feather'
+
+# Text log parsing (on raw bytes): one match per test block (run of non-blank lines),
+# each group holding the value of the block's line starting with that field (b'' if none)
+LOG_FIELDS = ('model', 'category', 'language', 'temperature', 'success')
+LOG_BLOCK = re.compile(rb'(?im)(?:^[ \t]*(?:'
+                       + b'|'.join(rb'%s[ \t]*:[ \t]*(.*\S)' % field.encode() for field in LOG_FIELDS)
+                       + rb'|.*\S)[ \t]*(?:\n|\Z))+')
+SUCCESS_VALUES = {'true', '1', 'yes', 'success'}
+
+# Conversions of typed log fields, applied to whole (decoded) columns
+LOG_CASTS = {
+    'temperature': lambda values: pd.to_numeric(values, errors='coerce'),
+    'success': lambda values: values.str.lower().isin(SUCCESS_VALUES).astype('int8').where(values.notna()),
 }
 
+def _decode_log_values(values):
+    """Decode a column of raw log values, each distinct value once"""
+    return values.map({value: value.decode('utf-8') for value in values.unique()})
+
 def parse_text_log(filepath):
     """Parse text log file into DataFrame"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            
+            # Scan test blocks straight from the page cache
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                blocks = LOG_BLOCK.findall(content)
         
-        # Split by test blocks (separated by blank lines)
-        blocks = [b.strip() for b in content.split('\n\n') if b.strip()]
+        df = pd.DataFrame(blocks, columns=LOG_FIELDS).apply(_decode_log_values).replace('', np.nan)
+        df = df.dropna(subset=['model', 'category'])
+        if df.empty:
+            return None
         
-        data = []
-        for block in blocks:
-            test = {}
-            for line in block.split('\n'):
-                line = line.strip()
-                if 'Model:' in line or 'model:' in line:
-                    test['model'] = line.split(':', 1)[1].strip()
-                elif 'Category:' in line or 'category:' in line:
-                    test['category'] = line.split(':', 1)[1].strip()
-                elif 'Language:' in line or 'language:' in line:
-                    test['language'] = line.split(':', 1)[1].strip()
-                elif 'Temperature:' in line or 'temperature:' in line:
-                    try:
-                        test['temperature'] = float(line.split(':', 1)[1].strip())
-                    except:
-                        pass
-                elif 'Success:' in line or 'success:' in line:
-                    val = line.split(':', 1)[1].strip().lower()
-                    test['success'] = 1 if val in ['true', '1', 'yes', 'success'] else 0
-            
-            if 'model' in test and 'category' in test:
-                data.append(test)
+        for field, cast in LOG_CASTS.items():
+            df[field] = cast(df[field])
         
-        return pd.DataFrame(data) if data else None
-    except Exception as e:
-        print(f"Error parsing text file: {e}")
+        # Keep only fields that appeared in the log
+        return df.dropna(axis=1, how='all').reset_index(drop=True)
+    except Exception:
+        logger.exception("Error parsing text file %s", filepath)
+        return None
+
+def load_csv(filepath):
+    """Load CSV file into DataFrame"""
+    try:
+        # Multithreaded reader, requires pyarrow
+        return pd.read_csv(filepath, encoding='utf-8', engine='pyarrow')
+    except (ImportError, ValueError):
+        pass
+    
+    try:
+        return pd.read_csv(filepath, encoding='utf-8', dtype=CSV_DTYPES, low_memory=False)
+    except (ValueError, TypeError):
+        # Columns don't match the expected schema (e.g. missing success values)
+        return pd.read_csv(filepath, encoding='utf-8', low_memory=False)
+
+def load_json(filepath):
+    """Load JSON file (list of records or single record) into DataFrame"""
+    if (ijson is not None and ijson.backend in IJSON_FAST_BACKENDS
+            and filepath.stat().st_size > JSON_STREAM_THRESHOLD):
+        # Stream top-level array items without holding the raw text in memory
+        try:
+            with open(filepath, 'rb') as f:
+                records = list(ijson.items(f, 'item', use_float=True))
+        except ijson.JSONError:
+            # e.g. NaN/Infinity tokens, left to the stdlib parser below
+            records = None
+        if records:
+            return pd.DataFrame(records)
+    
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        try:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity tokens (written by json.dump for missing floats) need the stdlib parser
+            data = json.loads(raw)
+    else:
+        data = json.loads(raw)
+    return pd.DataFrame(data if isinstance(data, list) else [data])
+
+def _optimize_dtypes(df):
+    """Store repeated labels as categoricals and downcast success flags"""
+    for column in ('model', 'category', 'language'):
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    # temperature stays float64: float32 turns labels like 0.7 into 0.699999988079071
+    if 'success' in df.columns and pd.api.types.is_numeric_dtype(df['success']):
+        df['success'] = pd.to_numeric(df['success'], downcast='integer')
+    return df
+
+def write_df_cache(df, output_dir):
+    """Write df as Feather for worker processes, returns path or None"""
+    cache_path = output_dir / DF_CACHE_NAME
+    try:
+        df.to_feather(cache_path)
+    except (ImportError, ValueError, TypeError, NotImplementedError) as e:
+        # pyarrow missing or columns not representable in Arrow
+        logger.warning("DataFrame cache disabled: %s", e)
+        cache_path.unlink(missing_ok=True)
         return None
+    return cache_path
+
+def _pool_context():
+    """Start workers from a clean process: forking the multi-threaded server
+    can copy locks held by other threads into the children"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+def _init_viz_worker(df, cache_path=None):
+    """Process pool initializer: fast PNG saving for the engine's charts, load df"""
+    global _worker_df
+    # Patched only in (dedicated) worker processes, importing web_app leaves matplotlib alone
+    Figure.savefig = _savefig_fast_png
+    if cache_path is not None:
+        from pyarrow import feather
+        df = feather.read_table(cache_path, memory_map=True).to_pandas()
+    _worker_df = df
+
+def _run_viz_stage(functions, output_dir):
+    """Run one visualization stage inside a worker process"""
+    for name in functions:
+        getattr(viz, name)(_worker_df, output_dir)
+
+def collect_outputs(output_dir):
+    """Collect generated charts (.png) and tables (.csv) in one directory walk,
+    returns full paths and paths relative to output_dir"""
+    files = {'charts': [], 'tables': []}
+    relative = {'charts': [], 'tables': []}
+    for root, dirs, filenames in os.walk(output_dir):
+        dirs.sort()
+        root = Path(root)
+        relative_root = root.relative_to(output_dir)
+        for name in sorted(filenames):
+            kind = 'charts' if name.endswith('.png') else 'tables' if name.endswith('.csv') else None
+            if kind:
+                files[kind].append(root / name)
+                relative[kind].append(str(relative_root / name))
+    return files, relative
+
+@lru_cache(maxsize=None)
+def _code_fingerprint():
+    """Short hash of this app and the visualization engine, part of the result cache key"""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in (__file__, viz.__file__):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def create_session_dir(target=None):
+    """Create timestamped session directory, as a link to target if given"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Suffix keeps jobs started within the same second apart
+    session_dir = OUTPUT_ROOT / f"session_{timestamp}_{uuid.uuid4().hex[:8]}"
+    if target is None:
+        session_dir.mkdir(parents=True)
+        return session_dir
+    
+    target.mkdir(parents=True, exist_ok=True)
+    try:
+        session_dir.symlink_to(target.resolve(), target_is_directory=True)
+    except OSError:
+        # No symlink support (e.g. Windows without privileges) or name taken
+        return target
+    return session_dir
+
+def publish_result(session_dir, result_dir):
+    """Move a fully rendered session into the result cache, leaving a link at its
+    old path, returns the directory to serve it from"""
+    # Marker moves with the directory, so a result dir is never visible half-written
+    marker = session_dir / RESULT_COMPLETE_MARKER
+    marker.touch()
+    result_dir.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(session_dir, result_dir)
+    except OSError:
+        # Another job published this input first (or a stale directory is in the way)
+        marker.unlink()
+        return session_dir
+    try:
+        session_dir.symlink_to(result_dir.resolve(), target_is_directory=True)
+    except OSError:
+        return result_dir
+    return session_dir
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'csv', 'json', 'txt'}
 
-def generate_visualizations(filepath):
+def update_status(job_id, **fields):
+    """Update a job's status, publish a snapshot to its progress queue and
+    mirror it in current_status if it is the latest job"""
+    with state_lock:
+        job = JOBS.get(job_id)
+        if job is not None:
+            job['status'].update(fields)
+            snapshot = dict(job['status'])
+            subscribers = list(job['subscribers'])
+            if not snapshot['running']:
+                job['finished'] = time.monotonic()
+        else:
+            snapshot = dict(current_status, **fields, job_id=job_id)
+        if current_status['job_id'] == job_id:
+            current_status.update(snapshot)
+    if job is not None:
+        for subscriber in subscribers:
+            subscriber.put(snapshot)
+
+def _expire_jobs():
+    """Drop jobs finished more than JOB_TTL seconds ago (call with state_lock held)"""
+    now = time.monotonic()
+    for job_id in [job_id for job_id, job in JOBS.items()
+                   if job['finished'] is not None and now - job['finished'] > JOB_TTL]:
+        del JOBS[job_id]
+
+def run_viz_stages(job_id, output_dir, worker_args):
+    """Run VIZ_STAGES in a process pool, each once its dependencies succeeded,
+    returns errors as a list of {'stage', 'error'}"""
+    errors = []
+    failed = set()
+    finished = set()
+    pending = list(VIZ_STAGES)
+    total = len(VIZ_STAGES)
+    max_workers = min(total, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=_pool_context(),
+                             initializer=_init_viz_worker,
+                             initargs=worker_args) as pool:
+        running = {}
+        while pending or running:
+            # Skip stages with a failed dependency, submit those with all deps done
+            waiting = []
+            for label, functions, deps in pending:
+                failed_deps = [dep for dep in deps if dep in failed]
+                if failed_deps:
+                    failed.add(label)
+                    finished.add(label)
+                    errors.append({'stage': label, 'error': f"Skipped: {', '.join(failed_deps)} failed"})
+                    logger.warning("Skipped %s: %s failed", label, ', '.join(failed_deps))
+                elif all(dep in finished for dep in deps):
+                    running[pool.submit(_run_viz_stage, functions, output_dir)] = label
+                else:
+                    waiting.append((label, functions, deps))
+            if len(waiting) < len(pending):
+                pending = waiting
+                continue
+            if not running:
+                raise ValueError(f"Unknown stage dependencies: {pending}")
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                label = running.pop(future)
+                finished.add(label)
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.add(label)
+                    errors.append({'stage': label, 'error': str(e)})
+                    logger.exception("Error in %s", label)
+                update_status(job_id, errors=list(errors), progress=20 + 70 * len(finished) // total,
+                              message=f'Generated {label} ({len(finished)}/{total})')
+    return errors
+
+def generate_visualizations(filepath, job_id=None, cache_key=None):
     """Generate visualizations from file"""
-    global current_status
-    
     try:
-        current_status['running'] = True
-        current_status['progress'] = 5
-        current_status['message'] = 'Loading data...'
-        current_status['error'] = None
+        update_status(job_id, running=True, progress=5, message='Loading data...', error=None, errors=[])
+        
+        # Reuse output of an earlier run on identical input
+        result_dir = RESULT_CACHE_DIR / cache_key if cache_key else None
+        if result_dir is not None and (result_dir / RESULT_COMPLETE_MARKER).exists():
+            output_dir = create_session_dir(result_dir)
+            _, relative = collect_outputs(output_dir)
+            charts, tables = relative['charts'], relative['tables']
+            update_status(job_id, output_dir=str(output_dir), charts=charts, tables=tables, progress=100,
+                          message=f'Complete! Reused {len(charts)} charts and {len(tables)} tables from an earlier run')
+            return
         
         # Load data
         filepath = Path(filepath)
         
         if filepath.suffix.lower() == '.csv':
-            df = pd.read_csv(filepath, encoding='utf-8')
+            df = load_csv(filepath)
         elif filepath.suffix.lower() == '.json':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            df = pd.DataFrame(data if isinstance(data, list) else [data])
+            df = load_json(filepath)
         elif filepath.suffix.lower() == '.txt':
             # Parse text log file
             df = parse_text_log(filepath)
@@ -98,118 +444,103 @@ def generate_visualizations(filepath):
         else:
             raise ValueError(f"Unsupported file type: {filepath.suffix}")
         
-        current_status['progress'] = 10
-        current_status['message'] = f'Loaded {len(df):,} records'
-        
-        # Create output directory
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_dir = Path("thesis_visualizations") / f"session_{timestamp}"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        current_status['output_dir'] = str(output_dir)
-        current_status['progress'] = 15
-        
-        # Generate visualizations
-        total_steps = 11
+        df = _optimize_dtypes(df)
         
-        # 1. Linear progression
-        current_status['message'] = 'Generating linear progression charts...'
-        current_status['progress'] = 20
-        try:
-            viz.create_linear_progression_charts(df, output_dir)
-        except Exception as e:
-            print(f"Error in linear progression: {e}")
-        
-        # 2. Temperature analysis
-        current_status['message'] = 'Generating temperature analysis...'
-        current_status['progress'] = 30
-        try:
-            viz.create_enhanced_temperature_analysis(df, output_dir)
-            viz.create_temperature_heatmaps(df, output_dir)
-            viz.create_2d_temperature_language_comparison(df, output_dir)
-        except Exception as e:
-            print(f"Error in temperature analysis: {e}")
+        update_status(job_id, progress=10, message=f'Loaded {len(df):,} records')
         
-        # 3. Bar charts
-        current_status['message'] = 'Generating bar charts...'
-        current_status['progress'] = 40
-        try:
-            viz.create_enhanced_bar_charts(df, output_dir)
-        except Exception as e:
-            print(f"Error in bar charts: {e}")
+        # Render into a private directory, published to the result cache on success
+        output_dir = create_session_dir()
         
-        # 4. Pie charts
-        current_status['message'] = 'Generating pie charts...'
-        current_status['progress'] = 50
-        try:
-            viz.create_pie_charts(df, output_dir)
-        except Exception as e:
-            print(f"Error in pie charts: {e}")
+        update_status(job_id, output_dir=str(output_dir), progress=15)
         
-        # 5. Heatmaps
-        current_status['message'] = 'Generating heatmaps...'
-        current_status['progress'] = 60
-        try:
-            viz.create_model_language_heatmap(df, output_dir)
-            viz.create_category_language_heatmap(df, output_dir)
-        except Exception as e:
-            print(f"Error in heatmaps: {e}")
+        # Generate visualizations (independent stages rendered in parallel)
+        update_status(job_id, progress=20, message='Generating visualizations...')
         
-        # 6. Dashboard
-        current_status['message'] = 'Generating dashboard...'
-        current_status['progress'] = 70
+        # Workers map the Feather cache instead of each unpickling df
+        cache_path = write_df_cache(df, output_dir)
         try:
-            viz.create_analysis_summary_dashboard(df, output_dir)
-        except Exception as e:
-            print(f"Error in dashboard: {e}")
+            worker_args = (None, cache_path) if cache_path else (df, None)
+            errors = run_viz_stages(job_id, output_dir, worker_args)
+        finally:
+            if cache_path:
+                cache_path.unlink(missing_ok=True)
         
-        # 7. Tables
-        current_status['message'] = 'Generating statistical tables...'
-        current_status['progress'] = 80
+        # HTML report
+        update_status(job_id, progress=95, message='Generating HTML report...')
+        files_dict, relative = collect_outputs(output_dir)
         try:
-            viz.create_comparison_tables(df, output_dir)
-            viz.create_temperature_comparison_table(df, output_dir)
-            viz.create_model_specific_category_tables(df, output_dir)
-        except Exception as e:
-            print(f"Error in tables: {e}")
-        
-        # 8. Model-specific analysis
-        current_status['message'] = 'Generating model-specific analysis...'
-        current_status['progress'] = 90
-        try:
-            viz.create_model_specific_temperature_language_analysis(df, output_dir)
-            viz.create_models_temperature_language_summary(df, output_dir)
-            viz.create_detailed_model_language_comparison(df, output_dir)
-        except Exception as e:
-            print(f"Error in model analysis: {e}")
-        
-        # 9. HTML report
-        current_status['message'] = 'Generating HTML report...'
-        current_status['progress'] = 95
-        try:
-            files_dict = {
-                'charts': list(output_dir.glob("**/*.png")),
-                'tables': list(output_dir.glob("**/*.csv"))
-            }
             viz.create_simple_html_report(df, output_dir, files_dict)
         except Exception as e:
-            print(f"Error in HTML report: {e}")
+            logger.exception("HTML report")
+            errors.append({'stage': 'HTML report', 'error': str(e)})
         
         # Collect results
-        current_status['charts'] = [str(f.relative_to(output_dir)) for f in output_dir.glob("**/*.png")]
-        current_status['tables'] = [str(f.relative_to(output_dir)) for f in output_dir.glob("**/*.csv")]
+        charts, tables = relative['charts'], relative['tables']
         
-        current_status['progress'] = 100
-        current_status['message'] = f'Complete! Generated {len(current_status["charts"])} charts and {len(current_status["tables"])} tables'
+        # Only fully successful runs are reused
+        if result_dir is not None and not errors:
+            output_dir = publish_result(output_dir, result_dir)
+        
+        message = f'Complete! Generated {len(charts)} charts and {len(tables)} tables'
+        if errors:
+            message += f' ({len(errors)} stages failed or skipped)'
+        update_status(job_id, output_dir=str(output_dir), charts=charts, tables=tables, errors=errors,
+                      progress=100, message=message)
         
     except Exception as e:
-        current_status['error'] = str(e)
-        current_status['message'] = f'Error: {str(e)}'
-        import traceback
-        traceback.print_exc()
+        logger.exception("Visualization job %s", job_id)
+        update_status(job_id, error=str(e), message=f'Error: {str(e)}')
     
     finally:
-        current_status['running'] = False
+        update_status(job_id, running=False)
+
+def save_upload(stream, filename):
+    """Copy uploaded stream into the uploads folder, returns saved path and result cache key"""
+    uploads_dir = Path(app.config['UPLOAD_FOLDER'])
+    uploads_dir.mkdir(exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = uploads_dir / f"{timestamp}_{secure_filename(filename)}"
+    
+    # Hash contents while writing so identical uploads can reuse results
+    digest = blake3.blake3() if blake3 is not None else hashlib.blake2b(digest_size=32)
+    with open(filepath, 'wb') as f:
+        while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    
+    cache_key = f"{digest.hexdigest()}_{_code_fingerprint()}{filepath.suffix.lower()}"
+    return filepath, cache_key
+
+def start_generation(filepath, cache_key=None):
+    """Start generation in background, returns job id"""
+    job_id = uuid.uuid4().hex
+    status = dict(_new_status(job_id), running=True, message='Starting...')
+    with state_lock:
+        _expire_jobs()
+        JOBS[job_id] = {'status': status, 'subscribers': [], 'finished': None}
+        current_status.update(status)
+    
+    thread = threading.Thread(target=generate_visualizations, args=(filepath, job_id, cache_key), daemon=True)
+    thread.start()
+    return job_id
+
+@lru_cache(maxsize=128)
+def _table_json(filepath, mtime):
+    """Table CSV serialized as JSON records, cached until the file changes"""
+    df = pd.read_csv(filepath)
+    if orjson is not None:
+        return orjson.dumps(df.to_dict('records'))
+    return df.to_json(orient='records')
+
+def _json(obj):
+    """JSON response, serialized with orjson when available"""
+    body = orjson.dumps(obj) if orjson is not None else json.dumps(obj)
+    return Response(body, mimetype='application/json')
+
+def _json_text(obj):
+    """JSON string, serialized with orjson when available"""
+    return orjson.dumps(obj).decode() if orjson is not None else json.dumps(obj)
 
 @app.route('/')
 def index():
@@ -220,35 +551,86 @@ def index():
 def upload_file():
     """Handle file upload"""
     if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+        return _json({'error': 'No file provided'}), 400
     
     file = request.files['file']
     
     if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+        return _json({'error': 'No file selected'}), 400
     
     if not allowed_file(file.filename):
-        return jsonify({'error': 'Invalid file type. Use CSV or JSON'}), 400
+        return _json({'error': 'Invalid file type. Use CSV or JSON'}), 400
     
-    # Save file
-    uploads_dir = Path(app.config['UPLOAD_FOLDER'])
-    uploads_dir.mkdir(exist_ok=True)
+    filepath, cache_key = save_upload(file.stream, file.filename)
+    job_id = start_generation(filepath, cache_key)
     
-    filename = secure_filename(file.filename)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filepath = uploads_dir / f"{timestamp}_{filename}"
-    file.save(filepath)
+    return _json({'success': True, 'message': 'File uploaded, generation started', 'job_id': job_id})
+
+@app.route('/upload/raw', methods=['POST'])
+def upload_raw():
+    """Handle raw (application/octet-stream) upload, filename in query string"""
+    filename = request.args.get('filename', '')
     
-    # Start generation in background
-    thread = threading.Thread(target=generate_visualizations, args=(filepath,), daemon=True)
-    thread.start()
+    if request.mimetype != 'application/octet-stream':
+        return _json({'error': 'Content-Type must be application/octet-stream'}), 415
+    
+    if request.content_length is None:
+        return _json({'error': 'Content-Length required'}), 411
+    
+    if request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        return _json({'error': 'File too large'}), 413
     
-    return jsonify({'success': True, 'message': 'File uploaded, generation started'})
+    if not allowed_file(filename):
+        return _json({'error': 'Invalid file type. Use CSV, JSON or TXT'}), 400
+    
+    filepath, cache_key = save_upload(request.stream, filename)
+    job_id = start_generation(filepath, cache_key)
+    
+    return _json({'success': True, 'message': 'File uploaded, generation started', 'job_id': job_id})
 
 @app.route('/status')
 def get_status():
     """Get current status"""
-    return jsonify(current_status)
+    with state_lock:
+        snapshot = dict(current_status)
+    return _json(snapshot)
+
+@app.route('/progress/<job_id>')
+def get_progress(job_id):
+    """Stream job status updates as Server-Sent Events"""
+    progress = queue.Queue()
+    with state_lock:
+        _expire_jobs()
+        job = JOBS.get(job_id)
+        streams = sum(len(other['subscribers']) for other in JOBS.values())
+        if job is not None and streams < MAX_PROGRESS_STREAMS:
+            # Start from the current status, then receive every later update
+            progress.put(dict(job['status']))
+            job['subscribers'].append(progress)
+    if job is None:
+        return _json({'error': 'Unknown job'}), 404
+    if streams >= MAX_PROGRESS_STREAMS:
+        response = _json({'error': 'Too many progress streams, poll /status instead'})
+        response.headers['Retry-After'] = SSE_KEEPALIVE
+        return response, 503
+    
+    def events():
+        try:
+            while True:
+                try:
+                    snapshot = progress.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"data: {_json_text(snapshot)}\n\n"
+                if not snapshot['running']:
+                    break
+        finally:
+            # Stream ended or client disconnected
+            with state_lock:
+                job['subscribers'].remove(progress)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream')
 
 @app.route('/chart/<path:filename>')
 def get_chart(filename):
@@ -263,9 +645,9 @@ def get_table(filename):
     if current_status['output_dir']:
         filepath = Path(current_status['output_dir']) / filename
         if filepath.exists():
-            df = pd.read_csv(filepath)
-            return jsonify(df.to_dict('records'))
-    return jsonify({'error': 'File not found'}), 404
+            body = _table_json(str(filepath), filepath.stat().st_mtime_ns)
+            return Response(body, mimetype='application/json')
+    return _json({'error': 'File not found'}), 404
 
 @app.route('/download/<path:filename>')
 def download_file(filename):
@@ -274,22 +656,38 @@ def download_file(filename):
         return send_from_directory(current_status['output_dir'], filename, as_attachment=True)
     return "No output directory", 404
 
+@app.after_request
+def add_asset_cache_headers(response):
+    """Let browsers keep charts/downloads requested with the current job id as ?v="""
+    if not request.path.startswith(('/chart/', '/download/')) or response.status_code not in (200, 304):
+        return response
+    
+    # URLs are not job-scoped: without a matching token, revalidate (ETag/Last-Modified).
+    # Files of a finished job never change, later jobs get a new id.
+    job_id = current_status['job_id']
+    if job_id and not current_status['running'] and request.args.get('v') == job_id:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
 @app.route('/reset', methods=['POST'])
 def reset():
     """Reset application state"""
-    global current_status
-    current_status = {
-        'running': False,
-        'progress': 0,
-        'message': 'Ready',
-        'output_dir': None,
-        'charts': [],
-        'tables': [],
-        'error': None
-    }
-    return jsonify({'success': True, 'message': 'Reset complete'})
+    with state_lock:
+        current_status.update(_new_status())
+    return _json({'success': True, 'message': 'Reset complete'})
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--debug', action='store_true',
+                        help='run the Flask development server with reloader and debugger')
+    args = parser.parse_args()
+    
+    logging.basicConfig(filename=LOG_FILE, level=logging.INFO,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
     print("="*70)
     print("CL-RAM THESIS VISUALIZATION - WEB INTERFACE")
     print("="*70)
@@ -299,4 +697,13 @@ if __name__ == '__main__':
     print("\nPress Ctrl+C to stop the server")
     print("="*70 + "\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    if args.debug:
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress not installed, using Flask's threaded server")
+            app.run(host='0.0.0.0', port=5000, threaded=True)
+        else:
+            serve(app, host='0.0.0.0', port=5000, threads=SERVER_THREADS)